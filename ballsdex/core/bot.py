@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-import inspect
+import functools
 import logging
 import math
+import re
+import sys
+import time
 import types
-from datetime import datetime
-from typing import TYPE_CHECKING, cast
+from collections import deque
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, cast
 
 import aiohttp
 import discord
@@ -21,13 +25,10 @@ from discord.app_commands.translator import (
 from discord.enums import Locale
 from discord.ext import commands
 from prometheus_client import Histogram
-from rich import box, print
-from rich.console import Console
-from rich.table import Table
+from rich import print
 
 from ballsdex.core.commands import Core
 from ballsdex.core.dev import Dev
-from ballsdex.core.metrics import PrometheusServer
 from ballsdex.core.models import (
     Ball,
     BlacklistedGuild,
@@ -44,10 +45,16 @@ from ballsdex.settings import settings
 
 if TYPE_CHECKING:
     from discord.ext.commands.bot import PrefixType
+    from discord.http import Route
+
+    from ballsdex.core.metrics import PrometheusServer
 
 log = logging.getLogger("ballsdex.core.bot")
 http_counter = Histogram("discord_http_requests", "HTTP requests", ["key", "code"])
 
+# the discord.http.Route of the request being currently sent, set by track_route
+current_route: ContextVar[Route | None] = ContextVar("ballsdex_route", default=None)
+
 PACKAGES = ["config", "players", "countryballs", "info", "admin", "trade", "balls"]
 
 
@@ -55,7 +62,22 @@ def owner_check(ctx: commands.Context[BallsDexBot]):
     return ctx.bot.is_owner(ctx.author)
 
 
+TRANSLATION_PATTERN = re.compile("countryball|BallsDex")
+
+
+@functools.lru_cache(maxsize=2048)
+def translate_message(message: str) -> str:
+    # single pass over the string for both replacements
+    # the result only depends on the message, it is cached as the set of strings is bounded
+    replacements = {"countryball": settings.collectible_name, "BallsDex": settings.bot_name}
+    return TRANSLATION_PATTERN.sub(lambda match: replacements[match[0]], message)
+
+
 class Translator(app_commands.Translator):
+    async def load(self):
+        # settings may have changed since the last time the translator was set
+        translate_message.cache_clear()
+
     async def translate(
         self, string: locale_str, locale: Locale, context: TranslationContextTypes
     ) -> str | None:
@@ -64,9 +86,26 @@ class Translator(app_commands.Translator):
             TranslationContextLocation.other,
         ):
             return None
-        return string.message.replace("countryball", settings.collectible_name).replace(
-            "BallsDex", settings.bot_name
-        )
+        return translate_message(string.message)
+
+
+def track_route(
+    request: Callable[..., Coroutine[Any, Any, Any]]
+) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """
+    Wrap `discord.http.HTTPClient.request` to expose the `Route` being requested to the
+    aiohttp trace callbacks, which run in the same context.
+    """
+
+    @functools.wraps(request)
+    async def wrapper(route: Route, *args, **kwargs):
+        token = current_route.set(route)
+        try:
+            return await request(route, *args, **kwargs)
+        finally:
+            current_route.reset(token)
+
+    return wrapper
 
 
 # observing the duration and status code of HTTP requests through aiohttp TraceConfig
@@ -84,21 +123,90 @@ async def on_request_end(
     trace_ctx: types.SimpleNamespace,
     params: aiohttp.TraceRequestEndParams,
 ):
-    time = session.loop.time() - trace_ctx.start
+    duration = session.loop.time() - trace_ctx.start
 
     # to categorize HTTP calls per path, we need to access the corresponding discord.http.Route
     # object, which is not available in the context of an aiohttp TraceConfig, therefore it's
-    # obtained by accessing the locals() from the calling function HTTPConfig.request
+    # stored in a context variable by the wrapper around HTTPClient.request (see track_route)
     # "params.url.path" is not usable as it contains raw IDs and tokens, breaking categories
-    frame = inspect.currentframe()
-    _locals = frame.f_back.f_back.f_back.f_back.f_back.f_locals  # type: ignore
-    if route := _locals.get("route"):
+    if route := current_route.get():
         route_key = route.key
     else:
-        # calling function is HTTPConfig.static_login which has no Route object
+        # request not sent through HTTPClient.request, there is no Route object
         route_key = f"{params.response.method} {params.url.path}"
 
-    http_counter.labels(route_key, params.response.status).observe(time)
+    http_counter.labels(route_key, params.response.status).observe(duration)
+
+
+async def send_error_message(interaction: discord.Interaction, content: str):
+    if interaction.response.is_done():
+        await interaction.followup.send(content, ephemeral=True)
+    else:
+        await interaction.response.send_message(content, ephemeral=True)
+
+
+async def on_check_failure(interaction: discord.Interaction, error: app_commands.CheckFailure):
+    await send_error_message(interaction, "You are not allowed to use that command.")
+
+
+async def on_command_on_cooldown(
+    interaction: discord.Interaction, error: app_commands.CommandOnCooldown
+):
+    await send_error_message(
+        interaction,
+        f"This command is on cooldown. Please retry in {math.ceil(error.retry_after)} seconds.",
+    )
+
+
+async def on_transformer_error(
+    interaction: discord.Interaction, error: app_commands.TransformerError
+):
+    await send_error_message(interaction, "One of the arguments provided cannot be parsed.")
+    log.debug("Failed running converter", exc_info=error)
+
+
+async def on_command_invoke_error(
+    interaction: discord.Interaction, error: app_commands.CommandInvokeError
+):
+    assert interaction.command
+
+    if isinstance(error.original, discord.Forbidden):
+        await send_error_message(
+            interaction, "The bot does not have the permission to do something."
+        )
+        # log to know where permissions are lacking
+        log.warning(
+            f"Missing permissions for app command {interaction.command.name}",
+            exc_info=error.original,
+        )
+        return
+
+    if isinstance(error.original, discord.InteractionResponded):
+        # most likely an interaction received twice (happens sometimes),
+        # or two instances are running on the same token.
+        log.warning(
+            f"Tried invoking command {interaction.command.name}, but the "
+            "interaction was already responded to.",
+            exc_info=error.original,
+        )
+        # still including traceback because it may be a programming error
+
+    log.error(f"Error in slash command {interaction.command.name}", exc_info=error.original)
+    await send_error_message(
+        interaction,
+        "An error occured when running the command. Contact support if this persists.",
+    )
+
+
+APP_COMMAND_ERROR_HANDLERS: dict[
+    type[app_commands.AppCommandError],
+    Callable[[discord.Interaction, Any], Coroutine[Any, Any, None]],
+] = {
+    app_commands.CommandOnCooldown: on_command_on_cooldown,
+    app_commands.CheckFailure: on_check_failure,
+    app_commands.TransformerError: on_transformer_error,
+    app_commands.CommandInvokeError: on_command_invoke_error,
+}
 
 
 class CommandTree(app_commands.CommandTree):
@@ -106,11 +214,11 @@ class CommandTree(app_commands.CommandTree):
         # checking if the moment we receive this interaction isn't too late already
         # there is a 3 seconds limit for initial response, taking a little margin into account
         # https://discord.com/developers/docs/interactions/receiving-and-responding#responding-to-an-interaction
-        delta = datetime.now(tz=interaction.created_at.tzinfo) - interaction.created_at
-        if delta.total_seconds() >= 2.8:
-            log.warning(
-                f"Skipping interaction {interaction.id}, running {delta.total_seconds()}s late."
-            )
+        # creation time is read from the snowflake directly, "created_at" builds a datetime
+        created_at = ((interaction.id >> 22) + discord.utils.DISCORD_EPOCH) / 1000
+        delta = time.time() - created_at
+        if delta >= 2.8:
+            log.warning(f"Skipping interaction {interaction.id}, running {delta}s late.")
             return False
 
         bot = interaction.client
@@ -118,7 +226,7 @@ class CommandTree(app_commands.CommandTree):
             if interaction.type != discord.InteractionType.autocomplete:
                 await interaction.response.send_message(
                     "The bot is currently starting, please wait for a few minutes... "
-                    f"({round((len(bot.shards)/bot.shard_count)*100)}%)",
+                    f"({bot.ready_percentage}%)",
                     ephemeral=True,
                 )
             return False  # wait for all shards to be connected
@@ -148,6 +256,9 @@ class BallsDexBot(commands.AutoShardedBot):
 
         super().__init__(command_prefix, intents=intents, tree_cls=CommandTree, **options)
 
+        if settings.prometheus_enabled:
+            self.http.request = track_route(self.http.request)  # type: ignore
+
         self.dev = dev
         self.prometheus_server: PrometheusServer | None = None
 
@@ -160,73 +271,108 @@ class BallsDexBot(commands.AutoShardedBot):
         self.catch_log: set[int] = set()
         self.command_log: set[int] = set()
         self.locked_balls = TTLCache(maxsize=99999, ttl=60 * 30)
+        self.healthcheck_session: aiohttp.ClientSession | None = None
+        # startup progress shown to users, updated as shards get ready
+        self.ready_percentage = 0
+
+        # sent on every interaction of blacklisted users, formatted once
+        appeal = (
+            f"\nYou can appeal this blacklist in our support server: {settings.discord_invite}"
+        )
+        self.blacklist_user_message = "You are blacklisted from the bot." + appeal
+        self.blacklist_guild_message = "This server is blacklisted from the bot." + appeal
 
         self.owner_ids: set
 
     async def start_prometheus_server(self):
+        # only imported when enabled, this pulls the aiohttp web server
+        from ballsdex.core.metrics import PrometheusServer
+
         self.prometheus_server = PrometheusServer(
             self, settings.prometheus_host, settings.prometheus_port
         )
         await self.prometheus_server.run()
 
-    def assign_ids_to_app_groups(
-        self, group: app_commands.Group, synced_commands: list[app_commands.AppCommandGroup]
-    ):
-        for synced_command in synced_commands:
-            bot_command = group.get_command(synced_command.name)
-            if not bot_command:
-                continue
-            bot_command.extras["mention"] = synced_command.mention
-            if isinstance(bot_command, app_commands.Group) and bot_command.commands:
-                self.assign_ids_to_app_groups(
-                    bot_command, cast(list[app_commands.AppCommandGroup], synced_command.options)
-                )
-
     def assign_ids_to_app_commands(self, synced_commands: list[app_commands.AppCommand]):
-        for synced_command in synced_commands:
-            bot_command = self.tree.get_command(synced_command.name, type=synced_command.type)
+        # walk the command tree breadth-first, pairing each local command with its synced version
+        queue: deque[
+            tuple[
+                app_commands.Command | app_commands.ContextMenu | app_commands.Group | None,
+                app_commands.AppCommand | app_commands.AppCommandGroup,
+            ]
+        ] = deque(
+            (self.tree.get_command(synced_command.name, type=synced_command.type), synced_command)
+            for synced_command in synced_commands
+        )
+        while queue:
+            bot_command, synced_command = queue.popleft()
             if not bot_command:
                 continue
             bot_command.extras["mention"] = synced_command.mention
             if isinstance(bot_command, app_commands.Group) and bot_command.commands:
-                self.assign_ids_to_app_groups(
-                    bot_command, cast(list[app_commands.AppCommandGroup], synced_command.options)
+                queue.extend(
+                    (bot_command.get_command(option.name), option)
+                    for option in cast(list[app_commands.AppCommandGroup], synced_command.options)
                 )
 
     async def load_cache(self):
-        table = Table(box=box.SIMPLE)
-        table.add_column("Model", style="cyan")
-        table.add_column("Count", justify="right", style="green")
-
-        balls.clear()
-        for ball in await Ball.all():
-            balls[ball.pk] = ball
-        table.add_row(settings.collectible_name.title() + "s", str(len(balls)))
-
-        regimes.clear()
-        for regime in await Regime.all():
-            regimes[regime.pk] = regime
-        table.add_row("Regimes", str(len(regimes)))
-
-        economies.clear()
-        for economy in await Economy.all():
-            economies[economy.pk] = economy
-        table.add_row("Economies", str(len(economies)))
+        # those queries are independent, run them concurrently instead of one after another
+        (
+            ball_rows,
+            regime_rows,
+            economy_rows,
+            special_rows,
+            blacklisted_ids,
+            blacklisted_guilds,
+        ) = await asyncio.gather(
+            Ball.all(),
+            Regime.all(),
+            Economy.all(),
+            Special.all(),
+            # raw values, there is no need to build model instances
+            BlacklistedID.all().values_list("discord_id", flat=True),
+            BlacklistedGuild.all().values_list("discord_id", flat=True),
+        )
 
-        specials.clear()
-        for special in await Special.all():
-            specials[special.pk] = special
-        table.add_row("Special events", str(len(specials)))
+        model_caches: list[tuple[dict[int, Any], list[Any]]] = [
+            (balls, ball_rows),
+            (regimes, regime_rows),
+            (economies, economy_rows),
+            (specials, special_rows),
+        ]
+        for cache, rows in model_caches:
+            cache.clear()
+            cache.update({row.pk: row for row in rows})
+
+        self.blacklist = set(blacklisted_ids)
+        self.blacklist_guild = set(blacklisted_guilds)
+        # let packages drop whatever they derived from the previous cache
+        self.dispatch("ballsdex_cache_reload")
+
+        summary = {
+            settings.collectible_name.title() + "s": len(balls),
+            "Regimes": len(regimes),
+            "Economies": len(economies),
+            "Special events": len(specials),
+            "Blacklisted users": len(self.blacklist),
+            "Blacklisted guilds": len(self.blacklist_guild),
+        }
+        if not sys.stdout.isatty():
+            # rendering a table is only worth it for a human reading a terminal
+            log.info(
+                "Cache loaded: %s", ", ".join(f"{name}={count}" for name, count in summary.items())
+            )
+            return
 
-        self.blacklist = set()
-        for blacklisted_id in await BlacklistedID.all().only("discord_id"):
-            self.blacklist.add(blacklisted_id.discord_id)
-        table.add_row("Blacklisted users", str(len(self.blacklist)))
+        from rich import box
+        from rich.console import Console
+        from rich.table import Table
 
-        self.blacklist_guild = set()
-        for blacklisted_id in await BlacklistedGuild.all().only("discord_id"):
-            self.blacklist_guild.add(blacklisted_id.discord_id)
-        table.add_row("Blacklisted guilds", str(len(self.blacklist_guild)))
+        table = Table(box=box.SIMPLE)
+        table.add_column("Model", style="cyan")
+        table.add_column("Count", justify="right", style="green")
+        for name, count in summary.items():
+            table.add_row(name, str(count))
 
         log.info("Cache loaded, summary displayed below")
         console = Console()
@@ -241,9 +387,13 @@ class BallsDexBot(commands.AutoShardedBot):
             base_url = str(discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY).replace(
                 "ws://", "http://"
             )
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{base_url}/health", timeout=10) as resp:
-                    return resp.status == 200
+            # reuse the same session (and its connection pool) across polling attempts
+            if self.healthcheck_session is None or self.healthcheck_session.closed:
+                self.healthcheck_session = aiohttp.ClientSession(
+                    timeout=aiohttp.ClientTimeout(total=10)
+                )
+            async with self.healthcheck_session.get(f"{base_url}/health") as resp:
+                return resp.status == 200
         except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
             return False
 
@@ -253,14 +403,23 @@ class BallsDexBot(commands.AutoShardedBot):
         if settings.gateway_url is None:
             return
 
-        while True:
-            response = await self.gateway_healthy()
-            if response is True:
-                log.info("Gateway proxy is ready!")
-                break
-
-            log.warning("Gateway proxy is not ready yet, waiting 30 more seconds...")
-            await asyncio.sleep(30)
+        try:
+            while True:
+                response = await self.gateway_healthy()
+                if response is True:
+                    log.info("Gateway proxy is ready!")
+                    break
+
+                log.warning("Gateway proxy is not ready yet, waiting 30 more seconds...")
+                await asyncio.sleep(30)
+        finally:
+            if self.healthcheck_session:
+                await self.healthcheck_session.close()
+                self.healthcheck_session = None
+
+    async def on_shard_ready(self, shard_id: int):
+        if self.shard_count:
+            self.ready_percentage = len(self.shards) * 100 // self.shard_count
 
     async def on_ready(self):
         if self.cogs != {}:
@@ -320,12 +479,21 @@ class BallsDexBot(commands.AutoShardedBot):
             log.info("No command to sync.")
 
         if "admin" in PACKAGES:
-            for guild_id in settings.admin_guild_ids:
-                guild = self.get_guild(guild_id)
-                if not guild:
-                    continue
-                synced_commands = await self.tree.sync(guild=guild)
-                log.info(f"Synced {len(synced_commands)} admin commands for guild {guild.id}.")
+            guilds = [
+                guild
+                for guild_id in settings.admin_guild_ids
+                if (guild := self.get_guild(guild_id))
+            ]
+            results = await asyncio.gather(
+                *(self.tree.sync(guild=guild) for guild in guilds), return_exceptions=True
+            )
+            for guild, result in zip(guilds, results):
+                if isinstance(result, BaseException):
+                    log.error(
+                        f"Failed to sync admin commands for guild {guild.id}", exc_info=result
+                    )
+                else:
+                    log.info(f"Synced {len(result)} admin commands for guild {guild.id}.")
 
         if settings.prometheus_enabled:
             try:
@@ -342,21 +510,13 @@ class BallsDexBot(commands.AutoShardedBot):
         if interaction.user.id in self.blacklist:
             if interaction.type != discord.InteractionType.autocomplete:
                 await interaction.response.send_message(
-                    "You are blacklisted from the bot."
-                    "\nYou can appeal this blacklist in our support server: {}".format(
-                        settings.discord_invite
-                    ),
-                    ephemeral=True,
+                    self.blacklist_user_message, ephemeral=True
                 )
             return False
         if interaction.guild_id and interaction.guild_id in self.blacklist_guild:
             if interaction.type != discord.InteractionType.autocomplete:
                 await interaction.response.send_message(
-                    "This server is blacklisted from the bot."
-                    "\nYou can appeal this blacklist in our support server: {}".format(
-                        settings.discord_invite
-                    ),
-                    ephemeral=True,
+                    self.blacklist_guild_message, ephemeral=True
                 )
             return False
         if interaction.command and interaction.user.id in self.command_log:
@@ -409,65 +569,20 @@ class BallsDexBot(commands.AutoShardedBot):
     async def on_application_command_error(
         self, interaction: discord.Interaction, error: app_commands.AppCommandError
     ):
-        async def send(content: str):
-            if interaction.response.is_done():
-                await interaction.followup.send(content, ephemeral=True)
-            else:
-                await interaction.response.send_message(content, ephemeral=True)
-
-        if isinstance(error, app_commands.CheckFailure):
-            if isinstance(error, app_commands.CommandOnCooldown):
-                await send(
-                    "This command is on cooldown. Please retry "
-                    f"in {math.ceil(error.retry_after)} seconds."
-                )
-                return
-            await send("You are not allowed to use that command.")
-            return
-
-        if isinstance(error, app_commands.TransformerError):
-            await send("One of the arguments provided cannot be parsed.")
-            log.debug("Failed running converter", exc_info=error)
-            return
-
-        if isinstance(error, app_commands.CommandInvokeError):
-            assert interaction.command
-
-            if isinstance(error.original, discord.Forbidden):
-                await send("The bot does not have the permission to do something.")
-                # log to know where permissions are lacking
-                log.warning(
-                    f"Missing permissions for app command {interaction.command.name}",
-                    exc_info=error.original,
-                )
+        # the handler is resolved from the exception's class hierarchy, most specific first
+        for error_type in type(error).__mro__:
+            if handler := APP_COMMAND_ERROR_HANDLERS.get(error_type):
+                await handler(interaction, error)
                 return
 
-            if isinstance(error.original, discord.InteractionResponded):
-                # most likely an interaction received twice (happens sometimes),
-                # or two instances are running on the same token.
-                log.warning(
-                    f"Tried invoking command {interaction.command.name}, but the "
-                    "interaction was already responded to.",
-                    exc_info=error.original,
-                )
-                # still including traceback because it may be a programming error
-
-            log.error(
-                f"Error in slash command {interaction.command.name}", exc_info=error.original
-            )
-            await send(
-                "An error occured when running the command. Contact support if this persists."
-            )
-            return
-
-        await send("An error occured when running the command. Contact support if this persists.")
+        await send_error_message(
+            interaction,
+            "An error occured when running the command. Contact support if this persists.",
+        )
         log.error("Unknown error in interaction", exc_info=error)
 
     async def on_error(self, event_method: str, /, *args, **kwargs):
-        formatted_args = ", ".join(args)
-        formatted_kwargs = " ".join(f"{x}={y}" for x, y in kwargs.items())
+        # arguments are formatted lazily, and with repr since they are rarely strings
         log.error(
-            f"Error in event {event_method}. Args: {formatted_args}. Kwargs: {formatted_kwargs}",
-            exc_info=True,
+            "Error in event %s. Args: %r. Kwargs: %r", event_method, args, kwargs, exc_info=True
         )
-        self.tree.interaction_check
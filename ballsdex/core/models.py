@@ -152,6 +152,10 @@ class Ball(models.Model):
 
     instances: fields.BackwardFKRelation[BallInstance]
 
+    class Meta:
+        # /admin rarity (without include_disabled) filters on enabled balls ordered by rarity
+        indexes = (("enabled", "rarity"),)
+
     def __str__(self) -> str:
         return self.country
 
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
 
 import discord
 from discord.ext.commands import Paginator as CommandPaginator
@@ -297,9 +297,11 @@ class FieldPageSource(menus.ListPageSource):
 
 
 class TextPageSource(menus.ListPageSource):
-    def __init__(self, text, *, prefix="```", suffix="```", max_size=2000):
+    def __init__(self, text: str | Iterable[str], *, prefix="```", suffix="```", max_size=2000):
         pages = CommandPaginator(prefix=prefix, suffix=suffix, max_size=max_size - 200)
-        for line in text.split("\n"):
+        if isinstance(text, str):
+            text = text.split("\n")
+        for line in text:
             pages.add_line(line)
 
         super().__init__(entries=pages.pages, per_page=1)
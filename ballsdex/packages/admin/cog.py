@@ -1,13 +1,15 @@
 import asyncio
 import datetime
+import io
+import itertools
 import logging
 import random
 import re
-from collections import defaultdict
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, cast
+from typing import TYPE_CHECKING, Iterator, Optional, cast
 
 import discord
+from cachetools import TTLCache
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Button
@@ -46,9 +48,16 @@ if TYPE_CHECKING:
 
 log = logging.getLogger("ballsdex.packages.admin.cog")
 FILENAME_RE = re.compile(r"^(.+)(\.\S+)$")
+SUSPICIOUS_GUILD_NAME_RE = re.compile(r"farm|grind|spam", re.IGNORECASE)
 
 
-async def save_file(attachment: discord.Attachment) -> Path:
+async def save_file(attachment: discord.Attachment) -> tuple[Path, bytes]:
+    """
+    Download an attachment once and write it to the uploads folder.
+
+    Returns the path written to and the downloaded bytes, so the file can be sent back without
+    being downloaded a second time.
+    """
     path = Path(f"./static/uploads/{attachment.filename}")
     match = FILENAME_RE.match(attachment.filename)
     if not match:
@@ -57,8 +66,9 @@ async def save_file(attachment: discord.Attachment) -> Path:
     while path.exists():
         path = Path(f"./static/uploads/{match.group(1)}-{i}{match.group(2)}")
         i = i + 1
-    await attachment.save(path)
-    return path
+    data = await attachment.read()
+    await asyncio.to_thread(path.write_bytes, data)
+    return path, data
 
 
 @app_commands.guilds(*settings.admin_guild_ids)
@@ -72,6 +82,39 @@ class Admin(commands.GroupCog):
         self.bot = bot
         self.blacklist.parent = self.__cog_app_commands_group__
         self.balls.parent = self.__cog_app_commands_group__
+        # guild ID -> whether spawn is enabled, configs rarely change so a short TTL is enough
+        self.spawn_enabled_cache: TTLCache[int, bool] = TTLCache(maxsize=10_000, ttl=60)
+
+    async def get_spawn_enabled(self, guild_ids: list[int]) -> dict[int, bool]:
+        """
+        Return whether spawn is enabled for each of the given guilds. Guilds missing from the
+        cache are fetched in a single query.
+        """
+        result: dict[int, bool] = {}
+        missing: list[int] = []
+        for guild_id in guild_ids:
+            if (enabled := self.spawn_enabled_cache.get(guild_id)) is None:
+                missing.append(guild_id)
+            else:
+                result[guild_id] = enabled
+        if missing:
+            configs = dict(
+                await GuildConfig.filter(guild_id__in=missing).values_list("guild_id", "enabled")
+            )
+            for guild_id in missing:
+                enabled = configs.get(guild_id, False)
+                self.spawn_enabled_cache[guild_id] = enabled
+                result[guild_id] = enabled
+        return result
+
+    @commands.Cog.listener()
+    async def on_ballsdex_settings_change(
+        self,
+        guild: discord.Guild,
+        channel: Optional[discord.TextChannel] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.spawn_enabled_cache.pop(guild.id, None)
 
     blacklist = app_commands.Group(name="blacklist", description="Bot blacklist management")
     blacklist_guild = app_commands.Group(
@@ -151,26 +194,35 @@ class Admin(commands.GroupCog):
         include_disabled: bool
             Include the countryballs that are disabled or with a rarity of 0.
         """
-        text = ""
         balls_queryset = Ball.all().order_by("rarity")
         if not include_disabled:
             balls_queryset = balls_queryset.filter(rarity__gt=0, enabled=True)
-        sorted_balls = await balls_queryset
+        # only the names and rarities are needed, no need to build model instances
+        sorted_balls: list[tuple[str, float]] = await balls_queryset.values_list(
+            "country", "rarity"
+        )
 
-        if chunked:
-            indexes: dict[float, list[Ball]] = defaultdict(list)
-            for ball in sorted_balls:
-                indexes[ball.rarity].append(ball)
+        if not sorted_balls:
+            await interaction.response.send_message(
+                f"No {settings.collectible_name} to rank.", ephemeral=True
+            )
+            return
+
+        def iter_lines() -> Iterator[str]:
+            if not chunked:
+                for i, (country, _) in enumerate(sorted_balls, start=1):
+                    yield f"{i}. {country}"
+                return
+            # rows are already sorted by rarity, balls with the same rarity share the same rank
             i = 1
-            for chunk in indexes.values():
-                for ball in chunk:
-                    text += f"{i}. {ball.country}\n"
+            for _, group in itertools.groupby(sorted_balls, key=lambda x: x[1]):
+                chunk = [country for country, _ in group]
+                for country in chunk:
+                    yield f"{i}. {country}"
                 i += len(chunk)
-        else:
-            for i, ball in enumerate(sorted_balls, start=1):
-                text += f"{i}. {ball.country}\n"
 
-        source = TextPageSource(text, prefix="```md\n", suffix="```")
+        # lines are fed straight to the paginator, no need to build the whole text first
+        source = TextPageSource(iter_lines(), prefix="```md\n", suffix="```")
         pages = Pages(source=source, interaction=interaction, compact=True)
         pages.remove_item(pages.stop_pages)
         await pages.start(ephemeral=True)
@@ -192,12 +244,13 @@ class Admin(commands.GroupCog):
         """
         if guild_id:
             try:
-                guild = self.bot.get_guild(int(guild_id))
+                parsed_guild_id = int(guild_id)
             except ValueError:
                 await interaction.response.send_message(
                     "Invalid guild ID. Please make sure it's a number.", ephemeral=True
                 )
                 return
+            guild = self.bot.get_guild(parsed_guild_id)
         else:
             guild = interaction.guild
         if not guild or not guild.member_count:
@@ -359,35 +412,23 @@ class Admin(commands.GroupCog):
                 )
             return
 
+        spawn_enabled_guilds = await self.get_spawn_enabled([guild.id for guild in guilds])
+
         entries: list[tuple[str, str]] = []
         for guild in guilds:
-            if config := await GuildConfig.get_or_none(guild_id=guild.id):
-                spawn_enabled = config.enabled and config.guild_id
-            else:
-                spawn_enabled = False
-
-            field_name = f"`{guild.id}`"
-            field_value = ""
-
-            # highlight suspicious server names
-            if any(x in guild.name.lower() for x in ("farm", "grind", "spam")):
-                field_value += f"- :warning: **{guild.name}**\n"
-            else:
-                field_value += f"- {guild.name}\n"
-
-            # highlight low member count
+            # highlight suspicious server names, low member count and enabled spawns
+            name = guild.name
+            if SUSPICIOUS_GUILD_NAME_RE.search(name):
+                name = f":warning: **{name}**"
+            members = f"{guild.member_count} members"
             if guild.member_count <= 3:  # type: ignore
-                field_value += f"- :warning: **{guild.member_count} members**\n"
-            else:
-                field_value += f"- {guild.member_count} members\n"
-
-            # highlight if spawning is enabled
-            if spawn_enabled:
-                field_value += "- :warning: **Spawn is enabled**"
-            else:
-                field_value += "- Spawn is disabled"
-
-            entries.append((field_name, field_value))
+                members = f":warning: **{members}**"
+            spawn = (
+                ":warning: **Spawn is enabled**"
+                if spawn_enabled_guilds[guild.id]
+                else "Spawn is disabled"
+            )
+            entries.append((f"`{guild.id}`", f"- {name}\n- {members}\n- {spawn}"))
 
         source = FieldPageSource(entries, per_page=25, inline=True)
         source.embed.set_author(name=f"{user} ({user.id})", icon_url=user.display_avatar.url)
@@ -1013,7 +1054,7 @@ class Admin(commands.GroupCog):
             return
         player, _ = await Player.get_or_create(discord_id=user.id)
         ball.player = player
-        await ball.save()
+        await ball.save(update_fields=("player_id",))
 
         trade = await Trade.create(player1=original_player, player2=player)
         await TradeObject.create(trade=trade, ballinstance=ball, player=original_player)
@@ -1208,7 +1249,7 @@ class Admin(commands.GroupCog):
             )
 
         try:
-            collection_card_path = await save_file(collection_card)
+            collection_card_path, collection_card_data = await save_file(collection_card)
         except Exception as e:
             log.exception("Failed saving file when creating countryball", exc_info=True)
             await interaction.followup.send(
@@ -1218,7 +1259,10 @@ class Admin(commands.GroupCog):
             )
             return
         try:
-            wild_card_path = await save_file(wild_card) if wild_card else default_path
+            if wild_card:
+                wild_card_path, wild_card_data = await save_file(wild_card)
+            else:
+                wild_card_path, wild_card_data = default_path, None
         except Exception as e:
             log.exception("Failed saving file when creating countryball", exc_info=True)
             await interaction.followup.send(
@@ -1253,9 +1297,22 @@ class Admin(commands.GroupCog):
                 "The full error is in the bot logs."
             )
         else:
-            files = [await collection_card.to_file()]
-            if wild_card:
-                files.append(await wild_card.to_file())
+            # same names and spoiler flags as the uploads, the saved copies may be renamed
+            files = [
+                discord.File(
+                    io.BytesIO(collection_card_data),
+                    filename=collection_card.filename,
+                    spoiler=collection_card.is_spoiler(),
+                )
+            ]
+            if wild_card and wild_card_data is not None:
+                files.append(
+                    discord.File(
+                        io.BytesIO(wild_card_data),
+                        filename=wild_card.filename,
+                        spoiler=wild_card.is_spoiler(),
+                    )
+                )
             await self.bot.load_cache()
             await interaction.followup.send(
                 f"Successfully created a {settings.collectible_name} with ID {ball.pk}! "
@@ -1516,26 +1573,23 @@ class Admin(commands.GroupCog):
             The amount of days to look back for the amount of balls caught.
         """
         await interaction.response.defer(ephemeral=True, thinking=True)
-        guild = self.bot.get_guild(int(guild_id))
+        try:
+            parsed_guild_id = int(guild_id)
+        except ValueError:
+            await interaction.followup.send("The guild ID you gave is not valid.", ephemeral=True)
+            return
+        guild = self.bot.get_guild(parsed_guild_id)
 
         if not guild:
             try:
-                guild = await self.bot.fetch_guild(int(guild_id))  # type: ignore
-            except ValueError:
-                await interaction.followup.send(
-                    "The guild ID you gave is not valid.", ephemeral=True
-                )
-                return
+                guild = await self.bot.fetch_guild(parsed_guild_id)
             except discord.NotFound:
                 await interaction.followup.send(
                     "The given guild ID could not be found.", ephemeral=True
                 )
                 return
 
-        if config := await GuildConfig.get_or_none(guild_id=guild.id):
-            spawn_enabled = config.enabled and config.guild_id
-        else:
-            spawn_enabled = False
+        spawn_enabled = (await self.get_spawn_enabled([guild.id]))[guild.id]
 
         total_server_balls = await BallInstance.filter(
             catch_date__gte=datetime.datetime.now() - datetime.timedelta(days=days),
@@ -7,7 +7,6 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from discord.ui import Button, View, button
-from tortoise.exceptions import DoesNotExist
 
 from ballsdex.core.models import (
     BallInstance,
@@ -161,9 +160,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         user_obj = user or interaction.user
         await interaction.response.defer(thinking=True)
 
-        try:
-            player = await Player.get(discord_id=user_obj.id)
-        except DoesNotExist:
+        player = await Player.get_or_none(discord_id=user_obj.id)
+        if player is None:
             if user_obj == interaction.user:
                 await interaction.followup.send(
                     f"You don't have any {settings.collectible_name} yet."
@@ -247,9 +245,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         """
         user_obj = user or interaction.user
         if user is not None:
-            try:
-                player = await Player.get(discord_id=user_obj.id)
-            except DoesNotExist:
+            player = await Player.get_or_none(discord_id=user_obj.id)
+            if player is None:
                 await interaction.response.send_message(
                     f"{user_obj.name} doesn't have any {settings.collectible_name} yet."
                 )
@@ -389,9 +386,8 @@ class Balls(commands.GroupCog, group_name=settings.players_group_cog_name):
         """
         user_obj = user if user else interaction.user
         await interaction.response.defer(thinking=True)
-        try:
-            player = await Player.get(discord_id=user_obj.id)
-        except DoesNotExist:
+        player = await Player.get_or_none(discord_id=user_obj.id)
+        if player is None:
             msg = f"{'You do' if user is None else f'{user_obj.display_name} does'}"
             await interaction.followup.send(
                 f"{msg} not have any {settings.collectible_name} yet.",
@@ -7,6 +7,4 @@ if TYPE_CHECKING:
 
 
 async def setup(bot: "BallsDexBot"):
-    cog = CountryBallsSpawner(bot)
-    await bot.add_cog(cog)
-    await cog.load_cache()
+    await bot.add_cog(CountryBallsSpawner(bot))
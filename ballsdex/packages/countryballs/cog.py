@@ -1,11 +1,13 @@
+import asyncio
 import logging
 from typing import TYPE_CHECKING, Optional
 
 import discord
 from discord.ext import commands
-from tortoise.exceptions import DoesNotExist
 
 from ballsdex.core.models import GuildConfig
+from ballsdex.packages.countryballs.components import invalidate_special_population
+from ballsdex.packages.countryballs.countryball import clear_wild_cards, invalidate_enabled_balls
 from ballsdex.packages.countryballs.spawn import SpawnManager
 
 if TYPE_CHECKING:
@@ -18,17 +20,39 @@ class CountryBallsSpawner(commands.Cog):
     def __init__(self, bot: "BallsDexBot"):
         self.spawn_manager = SpawnManager()
         self.bot = bot
+        # guild ID -> running config query, shared by messages arriving before it completes
+        self.spawn_channel_queries: dict[int, asyncio.Task[int]] = {}
 
-    async def load_cache(self):
-        i = 0
-        async for config in GuildConfig.all():
-            if not config.enabled:
-                continue
-            if not config.spawn_channel:
-                continue
-            self.spawn_manager.cache[config.guild_id] = config.spawn_channel
-            i += 1
-        log.info(f"Loaded {i} guilds in cache")
+    async def get_spawn_channel(self, guild_id: int) -> int:
+        """
+        Return the ID of the spawn channel of a guild, or 0 if spawn isn't enabled there.
+
+        Configs are fetched from the database the first time they're needed and kept in a TTL
+        cache, instead of loading every guild at startup.
+        """
+        try:
+            return self.spawn_manager.cache[guild_id]
+        except KeyError:
+            pass
+        task = self.spawn_channel_queries.get(guild_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_spawn_channel(guild_id))
+            self.spawn_channel_queries[guild_id] = task
+            task.add_done_callback(lambda t: self._forget_spawn_channel_query(guild_id, t))
+        # a cancelled message handler must not cancel the query other handlers wait for
+        return await asyncio.shield(task)
+
+    async def _fetch_spawn_channel(self, guild_id: int) -> int:
+        config = await GuildConfig.get_or_none(guild_id=guild_id, enabled=True)
+        channel_id = config.spawn_channel if config and config.spawn_channel else 0
+        # the settings changed while querying, this result may be outdated so don't cache it
+        if self.spawn_channel_queries.get(guild_id) is asyncio.current_task():
+            self.spawn_manager.cache[guild_id] = channel_id
+        return channel_id
+
+    def _forget_spawn_channel_query(self, guild_id: int, task: asyncio.Task[int]):
+        if self.spawn_channel_queries.get(guild_id) is task:
+            del self.spawn_channel_queries[guild_id]
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
@@ -37,11 +61,12 @@ class CountryBallsSpawner(commands.Cog):
         guild = message.guild
         if not guild:
             return
-        if guild.id not in self.spawn_manager.cache:
-            return
         if guild.id in self.bot.blacklist_guild:
             return
-        await self.spawn_manager.handle_message(message)
+        channel_id = await self.get_spawn_channel(guild.id)
+        if not channel_id:
+            return
+        await self.spawn_manager.handle_message(message, channel_id)
 
     @commands.Cog.listener()
     async def on_ballsdex_settings_change(
@@ -50,20 +75,12 @@ class CountryBallsSpawner(commands.Cog):
         channel: Optional[discord.TextChannel] = None,
         enabled: Optional[bool] = None,
     ):
-        if guild.id not in self.spawn_manager.cache:
-            if enabled is False:
-                return  # do nothing
-            if channel:
-                self.spawn_manager.cache[guild.id] = channel.id
-            else:
-                try:
-                    config = await GuildConfig.get(guild_id=guild.id)
-                except DoesNotExist:
-                    return
-                else:
-                    self.spawn_manager.cache[guild.id] = config.spawn_channel
-        else:
-            if enabled is False:
-                del self.spawn_manager.cache[guild.id]
-            elif channel:
-                self.spawn_manager.cache[guild.id] = channel.id
+        # the config is already saved, it will be fetched again on the next message
+        self.spawn_manager.cache.pop(guild.id, None)
+        self.spawn_channel_queries.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_ballsdex_cache_reload(self):
+        invalidate_enabled_balls()
+        invalidate_special_population()
+        clear_wild_cards()
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
 import logging
-import math
 import random
+import time
 from typing import TYPE_CHECKING, cast
 
 import discord
@@ -24,6 +24,54 @@ caught_balls = Counter(
 )
 
 
+def round_to_power_of_ten(number: int) -> int:
+    """
+    Round a positive number up to the nearest power of 10, anything below 1 giving 1.
+
+    The digits of `number - 1` are counted so that exact powers of 10 map to themselves
+    (100 stays 100, 101 becomes 1000), without going through a float logarithm.
+    """
+    if number <= 1:
+        return 1
+    return 10 ** len(str(number - 1))
+
+
+# (refresh time, population, weights) of the running special events
+_special_population: tuple[float, list[Special | None], list[float]] | None = None
+SPECIAL_POPULATION_TTL = 60
+
+
+def get_special_population() -> tuple[list[Special | None], list[float]]:
+    """
+    Return the special events currently running and their weights, with `None` representing
+    the common countryball. This is cached for a minute to keep it out of every catch.
+    """
+    global _special_population
+    timestamp = time.monotonic()
+    if _special_population and timestamp - _special_population[0] < SPECIAL_POPULATION_TTL:
+        return _special_population[1], _special_population[2]
+
+    now = datetime_now()
+    running = [x for x in specials.values() if x.start_date <= now <= x.end_date]
+    population: list[Special | None] = list(running)
+    weights = [x.rarity for x in running]
+    if running:
+        # Here we try to determine what should be the chance of having a common card
+        # since the rarity field is a value between 0 and 1, 1 being no common
+        # and 0 only common, we get the remaining value by doing (1-rarity)
+        # We then sum each value for each current event, and we should get an algorithm
+        # that kinda makes sense.
+        weights.append(sum(1 - x for x in weights))
+        population.append(None)
+    _special_population = (timestamp, population, weights)
+    return population, weights
+
+
+def invalidate_special_population():
+    global _special_population
+    _special_population = None
+
+
 class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name}!"):
     name = TextInput(
         label=f"Name of this {settings.collectible_name}",
@@ -54,11 +102,7 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
                 f"{interaction.user.mention} I was caught already!"
             )
             return
-        if self.ball.model.catch_names:
-            possible_names = (self.ball.name.lower(), *self.ball.model.catch_names.split(";"))
-        else:
-            possible_names = (self.ball.name.lower(),)
-        if self.name.value.lower().strip() in possible_names:
+        if self.name.value.lower().strip() in self.ball.possible_names:
             self.ball.catched = True
             await interaction.response.defer(thinking=True)
             ball, has_caught_before = await self.catch_ball(
@@ -97,18 +141,9 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
 
         # check if we can spawn cards with a special background
         special: "Special | None" = None
-        population = [x for x in specials.values() if x.start_date <= datetime_now() <= x.end_date]
+        population, weights = get_special_population()
         if not shiny and population:
-            # Here we try to determine what should be the chance of having a common card
-            # since the rarity field is a value between 0 and 1, 1 being no common
-            # and 0 only common, we get the remaining value by doing (1-rarity)
-            # We then sum each value for each current event, and we should get an algorithm
-            # that kinda makes sense.
-            common_weight = sum(1 - x.rarity for x in population)
-
-            weights = [x.rarity for x in population] + [common_weight]
-            # None is added representing the common countryball
-            special = random.choices(population=population + [None], weights=weights, k=1)[0]
+            special = random.choices(population=population, weights=weights, k=1)[0]
 
         is_new = not await BallInstance.filter(player=player, ball=self.ball.model).exists()
         ball = await BallInstance.create(
@@ -136,8 +171,8 @@ class CountryballNamePrompt(Modal, title=f"Catch this {settings.collectible_name
                 country=self.ball.model.country,
                 shiny=shiny,
                 special=special,
-                # observe the size of the server, rounded to the nearest power of 10
-                guild_size=10 ** math.ceil(math.log(max(user.guild.member_count - 1, 1), 10)),
+                # observe the size of the server, rounded up to the nearest power of 10
+                guild_size=round_to_power_of_ten(user.guild.member_count - 1),
             ).inc()
         return ball, is_new
 
@@ -1,9 +1,11 @@
+import io
 import logging
 import random
 import string
 from datetime import datetime
 
 import discord
+from cachetools import LRUCache
 
 from ballsdex.core.models import Ball, balls
 from ballsdex.packages.countryballs.components import CatchView
@@ -11,21 +13,64 @@ from ballsdex.settings import settings
 
 log = logging.getLogger("ballsdex.packages.countryballs")
 
+# enabled balls and their rarities, built on the first spawn and reset when the cache reloads
+_enabled_balls: tuple[list[Ball], list[float]] | None = None
+
+
+def invalidate_enabled_balls():
+    global _enabled_balls
+    _enabled_balls = None
+
+
+# recently spawned images, bounded by their total size since card art can weigh a few MB
+WILD_CARD_CACHE_SIZE = 16 * 1024 * 1024
+_wild_cards: LRUCache[str, bytes] = LRUCache(maxsize=WILD_CARD_CACHE_SIZE, getsizeof=len)
+
+
+def read_wild_card(path: str) -> bytes:
+    """
+    Return the content of a spawn image. Recently spawned images are kept in memory, up to
+    16 MB in total, and cleared with the other spawn caches when the bot's cache reloads.
+    """
+    try:
+        return _wild_cards[path]
+    except KeyError:
+        pass
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) <= WILD_CARD_CACHE_SIZE:
+        _wild_cards[path] = data
+    return data
+
+
+def clear_wild_cards():
+    _wild_cards.clear()
+
 
 class CountryBall:
+    # one instance is created per spawn
+    __slots__ = ("name", "model", "possible_names", "message", "catched", "time")
+
     def __init__(self, model: Ball):
         self.name = model.country
         self.model = model
+        # catch names are already lowercased when the ball is saved
+        self.possible_names = frozenset(
+            (self.name.lower(), *(model.catch_names.split(";") if model.catch_names else ()))
+        )
         self.message: discord.Message = discord.utils.MISSING
         self.catched = False
         self.time = datetime.now()
 
     @classmethod
     async def get_random(cls):
-        countryballs = list(filter(lambda m: m.enabled, balls.values()))
+        global _enabled_balls
+        if _enabled_balls is None:
+            enabled = [x for x in balls.values() if x.enabled]
+            _enabled_balls = (enabled, [x.rarity for x in enabled])
+        countryballs, rarities = _enabled_balls
         if not countryballs:
             raise RuntimeError("No ball to spawn")
-        rarities = [x.rarity for x in countryballs]
         cb = random.choices(population=countryballs, weights=rarities, k=1)[0]
         return cls(cb)
 
@@ -59,7 +104,9 @@ class CountryBall:
                 self.message = await channel.send(
                     f"A wild {settings.collectible_name} appeared!",
                     view=CatchView(self),
-                    file=discord.File(file_location, filename=file_name),
+                    file=discord.File(
+                        io.BytesIO(read_wild_card(file_location)), filename=file_name
+                    ),
                 )
                 return True
             else:
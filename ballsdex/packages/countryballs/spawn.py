@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import cast
 
 import discord
+from cachetools import TTLCache
 
 from ballsdex.packages.countryballs.countryball import CountryBall
 
@@ -86,9 +87,10 @@ class SpawnCooldown:
 @dataclass
 class SpawnManager:
     cooldowns: dict[int, SpawnCooldown] = field(default_factory=dict)
-    cache: dict[int, int] = field(default_factory=dict)
+    # guild ID -> spawn channel ID, 0 when spawn isn't enabled in that guild
+    cache: TTLCache[int, int] = field(default_factory=lambda: TTLCache(maxsize=50_000, ttl=3600))
 
-    async def handle_message(self, message: discord.Message):
+    async def handle_message(self, message: discord.Message, channel_id: int):
         guild = message.guild
         if not guild:
             return
@@ -127,13 +129,13 @@ class SpawnManager:
 
         # spawn countryball
         cooldown.reset(message.created_at)
-        await self.spawn_countryball(guild)
+        await self.spawn_countryball(guild, channel_id)
 
-    async def spawn_countryball(self, guild: discord.Guild):
-        channel = guild.get_channel(self.cache[guild.id])
+    async def spawn_countryball(self, guild: discord.Guild, channel_id: int):
+        channel = guild.get_channel(channel_id)
         if not channel:
-            log.warning(f"Lost channel {self.cache[guild.id]} for guild {guild.name}.")
-            del self.cache[guild.id]
+            log.warning(f"Lost channel {channel_id} for guild {guild.name}.")
+            self.cache[guild.id] = 0
             return
         ball = await CountryBall.get_random()
         await ball.spawn(cast(discord.TextChannel, channel))
@@ -0,0 +1,4 @@
+-- upgrade --
+CREATE INDEX "idx_ball_enabled_12b6e3" ON "ball" ("enabled", "rarity");
+-- downgrade --
+DROP INDEX "idx_ball_enabled_12b6e3";